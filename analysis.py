@@ -0,0 +1,172 @@
+'''
+Batched position analysis with an LRU result cache.
+
+    with Analyser(maxsize=10000, workers=4) as analyser:
+        results = analyser.analyse([fen, board, ...])
+
+Positions may be FEN strings or Boards. Each is keyed by its FEN
+(without the move clocks) and a canonical moved count for every
+piece, which is all the state move validation reads, so transposed
+positions share a key. Cached results are returned directly and the
+remaining positions are rebuilt from their keys and analysed in
+parallel on a process pool.
+'''
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from chess import Board
+
+
+# Order in which the moved counts of occupied squares appear in a key;
+# the same order as the pieces in a FEN
+KEY_ORDER = [(col, row) for row in range(7, -1, -1) for col in range(8)]
+
+
+def canonical_moved(piece):
+    '''
+    Return the smallest moved count that validates moves the same
+    as piece.moved does.
+
+    En passant capture checks for any piece that has moved exactly
+    once; pawn pushes and castling also check whether a pawn, king
+    or rook has moved at all. No other use is made of the count.
+    '''
+    if piece.moved == 1:
+        return 1
+    elif piece.name in ('pawn', 'king', 'rook'):
+        return min(piece.moved, 2)
+    else:
+        return 0
+
+
+def position_key(position):
+    '''
+    Return the cache key for a FEN string or Board.
+
+    A FEN cannot hold how many times each piece has moved, which move
+    validation depends on, so the key is the FEN without the move
+    clocks followed by the canonical moved count of each piece in FEN
+    order, e.g. '4k3/8/8/8/8/8/8/4K3 w - - 2,0'. Positions reached by
+    different move orders share a key. FEN strings are read with
+    Board.from_fen first.
+    '''
+    if isinstance(position, Board):
+        board = position
+    else:
+        board = Board.from_fen(position)
+    fen = ' '.join(board.fen().split()[:4])
+    moved = ','.join(str(canonical_moved(board.position[coord]))
+                     for coord in KEY_ORDER if coord in board.position)
+    return f'{fen} {moved}'
+
+
+def board_from_key(key, **kwargs):
+    '''Return a new Board in the exact position described by key.'''
+    fen, moved = key.rsplit(' ', 1)
+    board = Board.from_fen(fen, **kwargs)
+    coords = [coord for coord in KEY_ORDER if coord in board.position]
+    for coord, count in zip(coords, moved.split(',')):
+        board.position[coord].moved = int(count)
+    return board
+
+
+def analyse_position(key):
+    '''
+    Analyse the position with the given key and return a dict of:
+    - moves, the sorted valid moves for the player to move,
+    - checked, whether each player's king is in check,
+    - winner, the result of Board.winner(),
+    - evaluation, material balance from white's point of view.
+    '''
+    board = board_from_key(key, interactive=False)
+    evaluation = sum(piece.value for piece in board.pieces('white')) \
+        - sum(piece.value for piece in board.pieces('black'))
+    return {'fen': key.rsplit(' ', 1)[0],
+            'turn': board.turn,
+            'moves': sorted(board.valid_moves(board.turn)),
+            'checked': {'white': board.ischecked('white'),
+                        'black': board.ischecked('black'),
+                        },
+            'winner': board.winner(),
+            'evaluation': evaluation,
+            }
+
+
+class Analyser:
+    '''
+    Analyses batches of positions, caching up to maxsize results
+    and evicting the least recently used.
+    Cache misses are analysed on a pool of <workers> processes,
+    or in this process if workers is 0.
+    Returned results are shared with the cache and should not be
+    modified.
+    '''
+    def __init__(self, maxsize=4096, workers=None):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.workers = workers
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        '''Shut down the worker pool, if it was started.'''
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def analyse(self, positions):
+        '''Return a list of results, one per position, in order.'''
+        keys = [position_key(position) for position in positions]
+        results = {}
+        misses = []
+        for key in keys:
+            if key in results:
+                # Repeated within the batch; counted at first sight
+                continue
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                results[key] = self.cache[key]
+                self.hits += 1
+            else:
+                results[key] = None
+                misses.append(key)
+                self.misses += 1
+        for key, result in zip(misses, self.compute(misses)):
+            results[key] = result
+            self.store(key, result)
+        return [results[key] for key in keys]
+
+    def compute(self, keys):
+        '''Analyse keys, on the worker pool if there is one.'''
+        if self.workers == 0 or len(keys) <= 1:
+            return [analyse_position(key) for key in keys]
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        return list(self.executor.map(analyse_position, keys, chunksize=8))
+
+    def store(self, key, result):
+        self.cache[key] = result
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        '''Return cache metrics as a dict.'''
+        lookups = self.hits + self.misses
+        return {'size': len(self.cache),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                }
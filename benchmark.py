@@ -0,0 +1,203 @@
+'''
+Regression benchmarks for Board operations.
+
+Each case is run --repeat times and the fastest time is kept. Results
+are written as JSON and compared against a stored baseline; any case
+slower than the baseline by more than --threshold is reported as a
+regression and the exit status is 1. Everything is seeded and runs
+offline.
+
+Usage:
+    python3 benchmark.py --save-baseline    # record bench_baseline.json
+    python3 benchmark.py                    # compare against it
+'''
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from chess import Board
+from errors import MoveError
+from instrument import Profiler
+from selfplay import play_game
+
+# Crowded middlegame positions with no king in check, so ischecked
+# has to try every opposing piece
+MIDDLEGAMES = ['r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R w KQkq - 0 5',
+               'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+               'r1bq1rk1/pp2bppp/2n1pn2/2pp4/2PP4/2N1PN2/PP2BPPP/R1BQ1RK1 w - - 0 8',
+               ]
+
+# Games recorded from selfplay.py (random vs random, seeds 10 and 21),
+# in prompt() format
+RECORDED_GAMES = [
+    ['60 72', '17 25', '50 05', '57 75', '10 02', '37 04', '02 10', '04 14',
+     '31 33', '14 64', '30 52', '27 45', '52 16', '64 55', '72 64', '47 37',
+     '51 53', '55 00', '20 42', '37 47', '11 13', '45 27', '16 17', '47 57',
+     '10 22', '75 64', '17 06', '25 17', '42 15', '27 63', '41 43', '17 25',
+     '05 32', '64 55', '43 44', '63 45', '40 41', '45 01', '70 00', '25 17',
+     '22 14', '66 64', '15 04', '01 12', '32 65', '12 21', '44 45', '57 66',
+     '04 40', '17 25', '00 03', '21 43', '65 43', '07 27', '43 07', '25 06',
+     '40 04', '66 65', '41 50', '65 75', '03 01', '64 63', '07 43', '36 34',
+     '33 34', '27 57', '50 51', '57 07', '51 62', '55 00', '43 76', '26 24',
+     '45 46', '63 62'],
+    ['20 64', '57 13', '64 42', '56 54', '50 05', '16 05', '42 75', '37 15',
+     '75 66', '15 35', '66 75', '35 55', '30 52', '55 56', '52 63', '13 24',
+     '10 02', '17 25', '63 27', '24 51', '40 30', '54 53', '75 64', '56 34',
+     '60 52', '34 04', '30 20', '04 14', '70 40', '51 40', '20 10', '14 41',
+     '27 05', '41 74', '05 06', '07 17', '64 42', '17 37', '02 14', '25 06',
+     '14 22', '47 57', '42 20', '40 51', '20 02', '74 72', '22 14', '72 62',
+     '71 73', '06 14', '21 23', '62 65', '52 64', '46 44', '02 20', '57 56',
+     '31 33', '37 07', '20 75', '65 54', '75 31', '56 46', '23 14', '07 05',
+     '10 21', '46 55', '31 75', '54 27', '21 20', '55 54', '75 42', '05 07',
+     '64 76', '54 63', '42 06', '44 43', '00 10', '36 34', '14 15', '63 64',
+     '01 03', '43 42', '73 64'],
+]
+
+SQUARES = [(col, row) for col in range(8) for row in range(8)]
+
+
+def parse_move(move):
+    '''Convert a move like '41 43' into start and end tuples.'''
+    start, end = move.split(' ')
+    return (int(start[0]), int(start[1])), (int(end[0]), int(end[1]))
+
+
+def bench_start():
+    for _ in range(200):
+        Board(interactive=False).start()
+
+
+def bench_classify_move():
+    '''classify_move over every square pair, for both colours.'''
+    for fen in MIDDLEGAMES[:1]:
+        board = Board.from_fen(fen, interactive=False)
+        for colour in ('white', 'black'):
+            board.turn = colour
+            for start in SQUARES:
+                for end in SQUARES:
+                    try:
+                        board.classify_move(start, end, colour)
+                    except MoveError:
+                        pass
+
+
+def bench_ischecked():
+    boards = [Board.from_fen(fen, interactive=False) for fen in MIDDLEGAMES]
+    for _ in range(50):
+        for board in boards:
+            board.ischecked('white')
+            board.ischecked('black')
+
+
+def bench_update():
+    games = [[parse_move(move) for move in game] for game in RECORDED_GAMES]
+    for _ in range(5):
+        for game in games:
+            board = Board(interactive=False)
+            board.start()
+            for start, end in game:
+                board.update(start, end)
+                board.next_turn()
+
+
+def bench_update_sampled():
+    '''As bench_update, with a production sampling profiler attached.'''
+    games = [[parse_move(move) for move in game] for game in RECORDED_GAMES]
+    profiler = Profiler(sample_every=1000)
+    for _ in range(5):
+        for game in games:
+            board = Board(interactive=False, profiler=profiler)
+            board.start()
+            for start, end in game:
+                board.update(start, end)
+                board.next_turn()
+
+
+def bench_random_games():
+    for seed in range(4):
+        play_game('random', 'random', seed=seed, max_plies=200)
+
+
+CASES = {'start': bench_start,
+         'classify_move': bench_classify_move,
+         'ischecked': bench_ischecked,
+         'update': bench_update,
+         'update_sampled': bench_update_sampled,
+         'random_games': bench_random_games,
+         }
+
+
+def run(names, repeat=5):
+    '''Return {name: fastest time in seconds} for each case in names.'''
+    results = {}
+    for name in names:
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            CASES[name]()
+            times.append(time.perf_counter() - started)
+        results[name] = min(times)
+    return results
+
+
+def compare(results, baseline, threshold):
+    '''
+    Return {name: ratio} for cases more than threshold slower than
+    baseline, where ratio is current time / baseline time.
+    Cases missing from either side are skipped.
+    '''
+    regressions = {}
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base and seconds / base > 1 + threshold:
+            regressions[name] = seconds / base
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('cases', nargs='*',
+                        help=f'cases to run (default: all of {", ".join(CASES)})')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default='bench_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown as a fraction (default: 0.2)')
+    args = parser.parse_args(argv)
+    for name in args.cases:
+        if name not in CASES:
+            parser.error(f'unknown case {name!r}')
+
+    results = run(args.cases or list(CASES), args.repeat)
+    report = {'python': platform.python_version(),
+              'repeat': args.repeat,
+              'seconds': results,
+              }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, seconds in results.items():
+        print(f'{name:<15} {seconds * 1000:10.2f} ms')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Saved baseline to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline first')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)['seconds']
+    regressions = compare(results, baseline, args.threshold)
+    for name, ratio in regressions.items():
+        print(f'REGRESSION: {name} is {ratio:.2f}x the baseline time')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,11 @@
 from errors import *
+import movetables
 
 class BasePiece:
     name = 'piece'
+    value = 0
+    # Leapers jump to their end square, so cannot be blocked
+    leaper = False
     def __init__(self, colour):
         if type(colour) != str:
             raise TypeError('colour argument must be str')
@@ -20,6 +24,20 @@ class BasePiece:
     def symbol(self):
         return f'{self.sym[self.colour]}'
 
+    def targets(self, start):
+        '''
+        Return the squares this piece can move to from start,
+        ignoring other pieces, from the move table for its name.
+        '''
+        return movetables.targets(self.name, start)
+
+    def isvalid(self, start: tuple, end: tuple):
+        '''
+        Return True if the piece can move from start to end,
+        ignoring other pieces.
+        '''
+        return end in self.targets(start)
+
     @staticmethod
     def vector(start, end):
         '''
@@ -39,101 +57,84 @@ class BasePiece:
 
 
 class King(BasePiece):
+    '''
+    King can move one step in any direction
+    horizontally, vertically, or diagonally.
+    '''
     name = 'king'
+    value = 100
     sym = {'white': '♔', 'black': '♚'}
     def __repr__(self):
         return f"King('{self.colour}')"
 
-    def isvalid(self, start: tuple, end: tuple):
-        '''
-        King can move one step in any direction
-        horizontally, vertically, or diagonally.
-        '''
-        x, y, dist = self.vector(start, end)
-        return (dist == 1) or (abs(x) == abs(y) == 1)
 
-    
 class Queen(BasePiece):
+    '''
+    Queen can move any number of steps horizontally,
+    vertically, or diagonally.
+    '''
     name = 'queen'
+    value = 9
     sym = {'white': '♕', 'black': '♛'}
     def __repr__(self):
         return f"Queen('{self.colour}')"
 
-    def isvalid(self, start: tuple, end: tuple):
-        '''
-        Queen can move any number of steps horizontally,
-        vertically, or diagonally.
-        '''
-        x, y, dist = self.vector(start, end)
-        return (abs(x) == abs(y) != 0) \
-            or ((abs(x) == 0 and abs(y) != 0) \
-            or (abs(y) == 0 and abs(x) != 0))
-
 
 class Bishop(BasePiece):
+    '''Bishop can move any number of steps diagonally.'''
     name = 'bishop'
+    value = 3
     sym = {'white': '♗', 'black': '♝'}
     def __repr__(self):
         return f"Bishop('{self.colour}')"
 
-    def isvalid(self, start: tuple, end: tuple):
-        '''Bishop can move any number of steps diagonally.'''
-        x, y, dist = self.vector(start, end)
-        return (abs(x) == abs(y) != 0)
-
 
 class Knight(BasePiece):
+    '''
+    Knight moves 2 spaces in any direction, and
+    1 space perpendicular to that direction, in an L-shape.
+    '''
     name = 'knight'
+    value = 3
+    leaper = True
     sym = {'white': '♘', 'black': '♞'}
     def __repr__(self):
         return f"Knight('{self.colour}')"
 
-    def isvalid(self, start: tuple, end: tuple):
-        '''
-        Knight moves 2 spaces in any direction, and
-        1 space perpendicular to that direction, in an L-shape.
-        '''
-        x, y, dist = self.vector(start, end)
-        return (dist == 3) and (abs(x) != 3 and abs(y) != 3)
-
 
 class Rook(BasePiece):
+    '''
+    Rook can move any number of steps horizontally
+    or vertically.
+    '''
     name = 'rook'
+    value = 5
     sym = {'white': '♖', 'black': '♜'}
     def __repr__(self):
         return f"Rook('{self.colour}')"
 
-    def isvalid(self, start: tuple, end: tuple):
-        '''
-        Rook can move any number of steps horizontally
-        or vertically.
-        '''
-        x, y, dist = self.vector(start, end)
-        return (abs(x) == 0 and abs(y) != 0) \
-            or (abs(y) == 0 and abs(x) != 0) 
-
 
 class Pawn(BasePiece):
+    '''
+    Pawn moves forward two steps on its first move,
+    and one step after that. It captures one step
+    diagonally forward (see Board.ispawncapture).
+    '''
     name = 'pawn'
+    value = 1
     sym = {'white': '♙', 'black': '♟︎'}
     def __repr__(self):
         return f"Pawn('{self.colour}')"
 
-    def isvalid(self, start: tuple, end: tuple):
-        '''Pawn can only move 1 step forward.'''
-        x, y, dist = self.vector(start, end)
-        if x == 0:
-            if self.colour == 'black':
-                if self.moved:
-                    return (y == -1)
-                else:
-                    return (y == -2)
-            elif self.colour == 'white':
-                if self.moved:
-                    return (y == 1)
-                else:
-                    return (y == 2)
-        return False
+    def targets(self, start):
+        '''
+        Return the squares the pawn can push to from start:
+        two steps forward if it has not moved, else one.
+        '''
+        if self.moved:
+            return movetables.targets(f'pawn-{self.colour}', start)
+        else:
+            return movetables.targets(f'pawn-{self.colour}-first', start)
 
 
 
@@ -155,9 +156,29 @@ class Board:
     movetype = {'pawncapture', 'enpassant', 'castling', 'move'}
     def __init__(self, **kwargs):
         self.position = {}
+        # Coords of each piece type, keyed by (colour, name).
+        # Kept in step with self.position by add() and remove().
+        self.piece_coords = {}
+        # Square passed over by a pawn's two-step move on the
+        # last move, if any
+        self.enpassant = None
+        # Symbol grid for display, indexed [row][col]. Squares changed
+        # since it was last drawn are refreshed when it is next drawn.
+        self.symbols = [[' '] * 8 for row in range(8)]
+        self.changed = set()
+        self.drawn = False
         self.debug = kwargs.get('debug', False)
+        self.interactive = kwargs.get('interactive', True)
+        profiler = kwargs.get('profiler')
+        if profiler is not None:
+            profiler.attach(self)
 
     def debugmsg(self, msg):
+        '''
+        Print msg in debug mode.
+        In hot paths, check self.debug before calling so that
+        the message is not built when it will not be printed.
+        '''
         if self.debug:
             print('[DEBUG]', msg)
 
@@ -191,11 +212,16 @@ class Board:
         colour.
         Returns empty list if none found.
         '''
-        pieces = [i for i in self.coords() 
-                  if self.get_piece(i).name == name
-                  and self.get_piece(i).colour == colour
-                  ]
-        return pieces
+        return list(self.piece_coords.get((colour, name), ()))
+
+    def king_coord(self, colour):
+        '''
+        Return the coord of the <colour> king.
+        Returns None if there is no such king on the board.
+        '''
+        for coord in self.piece_coords.get((colour, 'king'), ()):
+            return coord
+        return None
     
     def get_piece(self, coord):
         '''
@@ -234,16 +260,24 @@ class Board:
             raise InvalidMoveError(start, end, 'Not a horizontal, vertical, or diagonal move')
         
     def add(self, coord, piece):
-        '''Add a piece at coord.'''
+        '''
+        Add a piece at coord.
+        Any piece already at coord is replaced.
+        '''
+        self.remove(coord)
         self.position[coord] = piece
+        self.changed.add(coord)
+        self.piece_coords.setdefault((piece.colour, piece.name), set()).add(coord)
 
     def remove(self, coord):
         '''
         Remove the piece at coord, if any.
         Does nothing if there is no piece at coord.
         '''
-        if coord in self.coords():
-            del self.position[coord]
+        piece = self.position.pop(coord, None)
+        if piece is not None:
+            self.piece_coords[(piece.colour, piece.name)].discard(coord)
+            self.changed.add(coord)
 
     def move(self, start, end, **kwargs):
         '''
@@ -253,18 +287,24 @@ class Board:
         '''
         piece = self.get_piece(start)
         piece.moved += 1
+        if piece.name == 'pawn' and abs(end[1] - start[1]) == 2:
+            self.enpassant = (start[0], (start[1] + end[1]) // 2)
+        else:
+            self.enpassant = None
+        if kwargs.get('movetype') == 'castling':
+            # The king may land on its own rook's square (e.g. in
+            # Chess960), so lift both pieces before placing either
+            rook_start, rook_end = self.castling_rook_move(start, end, piece.colour)
+            rook = self.get_piece(rook_start)
+            rook.moved += 1
+            self.remove(rook_start)
+            self.remove(start)
+            self.add(end, piece)
+            self.add(rook_end, rook)
+            return
         self.remove(start)
         self.add(end, piece)
-        if kwargs.get('movetype') == 'castling':
-            s_col, s_row = start
-            e_col, e_row = end
-            if e_col < s_col:    # castle leftward
-                piece = self.get_piece((0, s_row))
-                self.move((0, s_row), (3, e_row))
-            elif e_col > s_col:  # castle rightward
-                piece = self.get_piece((7, s_row))
-                self.move((7, s_row), (5, e_row))
-        elif kwargs.get('movetype') == 'enpassantcapture':
+        if kwargs.get('movetype') == 'enpassantcapture':
             s_col, s_row = start
             e_col, e_row = end
             enpassant_coord = (s_row, e_col)
@@ -298,26 +338,190 @@ class Board:
         
         self.turn = 'white'
         
-    def display(self):
+    fen_letters = {'king': 'k',
+                   'queen': 'q',
+                   'bishop': 'b',
+                   'knight': 'n',
+                   'rook': 'r',
+                   'pawn': 'p',
+                   }
+
+    def fen(self):
         '''
-        Displays the contents of the board.
-        Each piece is represented by a coloured symbol.
+        Return the position in Forsyth-Edwards Notation.
+
+        Castling rights are given for kings and rooks on their
+        starting squares that have not moved. The en passant square
+        is given if the last move was a pawn's two-step move.
+        The move clocks are not tracked and are always "0 1".
+        Raises ValueError if the board holds a piece that has no
+        FEN letter, such as a piece added with movetables.register.
         '''
-        # helper function to generate symbols for piece
-        # Row 7 is at the top, so print in reverse order
+        rows = []
         for row in range(7, -1, -1):
+            fenrow = ''
+            empty = 0
             for col in range(8):
-                coord = (col, row)  # tuple
-                if coord in self.coords():
-                    piece = self.get_piece(coord)
-                    print(f'{piece.symbol()}', end='')
+                piece = self.get_piece((col, row))
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    fenrow += str(empty)
+                    empty = 0
+                if piece.name not in self.fen_letters:
+                    raise ValueError(f'{piece.name} has no FEN letter')
+                letter = self.fen_letters[piece.name]
+                fenrow += letter.upper() if piece.colour == 'white' else letter
+            if empty:
+                fenrow += str(empty)
+            rows.append(fenrow)
+        turn = getattr(self, 'turn', 'white')
+
+        castling = ''
+        for colour, row in (('white', 0), ('black', 7)):
+            king = self.get_piece((4, row))
+            if king is None or king.name != 'king' \
+                    or king.colour != colour or king.moved:
+                continue
+            for col, letter in ((7, 'k'), (0, 'q')):
+                rook = self.get_piece((col, row))
+                if rook is not None and rook.name == 'rook' \
+                        and rook.colour == colour and not rook.moved:
+                    castling += letter.upper() if colour == 'white' else letter
+
+        enpassant = '-'
+        if self.enpassant is not None:
+            col, row = self.enpassant
+            enpassant = f'{"abcdefgh"[col]}{row + 1}'
+        return f'{"/".join(rows)} {turn[0]} {castling or "-"} {enpassant} 0 1'
+
+    @classmethod
+    def from_fen(cls, fen, **kwargs):
+        '''
+        Return a new Board set up from a FEN string.
+        Keyword arguments are passed on to Board().
+
+        Pieces are marked as moved twice unless the FEN shows otherwise:
+        pawns on their starting row, and kings and rooks with castling
+        rights, are unmoved; the pawn in front of the en passant square
+        has made one move. En passant capture checks for a piece that
+        has moved exactly once, so no other piece is left with one move.
+        '''
+        classes = {'k': King,
+                   'q': Queen,
+                   'b': Bishop,
+                   'n': Knight,
+                   'r': Rook,
+                   'p': Pawn,
+                   }
+        fields = fen.split()
+        if not 1 <= len(fields) <= 6:
+            raise ValueError(f'Invalid FEN {fen!r}')
+        fields += ['w', '-', '-', '0', '1'][len(fields) - 1:]
+        placement, turn, castling, enpassant = fields[:4]
+        rows = placement.split('/')
+        if len(rows) != 8 or turn not in ('w', 'b'):
+            raise ValueError(f'Invalid FEN {fen!r}')
+
+        board = cls(**kwargs)
+        for row, fenrow in zip(range(7, -1, -1), rows):
+            col = 0
+            for char in fenrow:
+                if char in '12345678':
+                    col += int(char)
+                elif char.lower() in classes and col <= 7:
+                    colour = 'white' if char.isupper() else 'black'
+                    piece = classes[char.lower()](colour)
+                    piece.moved = 2
+                    board.add((col, row), piece)
+                    col += 1
                 else:
-                    piece = None
-                    print(' ', end='')
-                if col == 7:     # Put line break at the end
-                    print('')
-                else:            # Print a space between pieces
-                    print(' ', end='')
+                    raise ValueError(f'Invalid FEN {fen!r}')
+            if col != 8:
+                raise ValueError(f'Invalid FEN {fen!r}')
+        board.turn = 'white' if turn == 'w' else 'black'
+
+        # Pawns can only leave their starting row with a two-step
+        # move, so any other pawn has moved at least twice unless it
+        # is the en passant pawn
+        for colour, row in (('white', 1), ('black', 6)):
+            for coord in board.get_coords(colour, 'pawn'):
+                board.get_piece(coord).moved = 0 if coord[1] == row else 2
+        for letter in castling.replace('-', ''):
+            colour, row = ('white', 0) if letter.isupper() else ('black', 7)
+            rook_col = {'k': 7, 'q': 0}.get(letter.lower())
+            king = board.get_piece((4, row))
+            rook = board.get_piece((rook_col, row)) if rook_col is not None else None
+            if king is None or king.name != 'king' or king.colour != colour \
+                    or rook is None or rook.name != 'rook' or rook.colour != colour:
+                raise ValueError(f'Invalid FEN {fen!r}')
+            king.moved = rook.moved = 0
+        if enpassant != '-':
+            col = 'abcdefgh'.find(enpassant[0])
+            row = 3 if enpassant[1:] == '3' else 4
+            pawn = board.get_piece((col, row)) if col >= 0 else None
+            if pawn is None or pawn.name != 'pawn':
+                raise ValueError(f'Invalid FEN {fen!r}')
+            pawn.moved = 1
+            board.enpassant = (col, 2 if row == 3 else 5)
+        return board
+
+    def refresh_symbols(self):
+        '''
+        Bring the symbol grid up to date with the board.
+        Returns list of coords whose symbol changed.
+        '''
+        refreshed = []
+        for coord in self.changed:
+            col, row = coord
+            if not (0 <= col <= 7 and 0 <= row <= 7):
+                continue
+            piece = self.get_piece(coord)
+            symbol = piece.symbol() if piece is not None else ' '
+            if self.symbols[row][col] != symbol:
+                self.symbols[row][col] = symbol
+                refreshed.append(coord)
+        self.changed.clear()
+        return refreshed
+
+    def render(self):
+        '''
+        Return the board as a string, one line per row,
+        with row 7 at the top.
+        '''
+        self.refresh_symbols()
+        return ''.join(' '.join(self.symbols[row]) + '\n'
+                       for row in range(7, -1, -1))
+
+    def render_diff(self):
+        '''
+        Return ANSI escape codes that redraw only the squares
+        changed since the board was last rendered.
+        Assumes the cursor is on the line just below the board,
+        where render() leaves it, and returns it there.
+        '''
+        out = []
+        for col, row in self.refresh_symbols():
+            up = row + 1  # row 0 is the line just above the cursor
+            out.append(f'\x1b[{up}A\x1b[{2 * col + 1}G'
+                       f'{self.symbols[row][col]}\x1b[{up}B')
+        if out:
+            out.append('\r')
+        return ''.join(out)
+
+    def display(self, diff=False):
+        '''
+        Displays the contents of the board.
+        Each piece is represented by a coloured symbol.
+        If diff is True and the board has been displayed before,
+        only the changed squares are redrawn (see render_diff()).
+        '''
+        if diff and self.drawn:
+            print(self.render_diff(), end='')
+        else:
+            print(self.render(), end='')
+        self.drawn = True
 
     def prompt(self):
         '''
@@ -386,7 +590,7 @@ class Board:
         for coord in self.get_coords('white', 'pawn'):
             col, row = coord
             if row == 7:
-                if self.debug:
+                if self.debug or not self.interactive:
                     ReplacementPieceClass = Queen
                 else:
                     ReplacementPieceClass = self.prompt_for_promotion_piece(coord)
@@ -396,7 +600,7 @@ class Board:
         for coord in self.get_coords('black', 'pawn'):
             col, row = coord
             if row == 0:
-                if self.debug:
+                if self.debug or not self.interactive:
                     ReplacementPieceClass = Queen
                 else:
                     ReplacementPieceClass = self.prompt_for_promotion_piece(coord)
@@ -406,7 +610,7 @@ class Board:
 
     def isblocked(self, start, end):
         piece = self.get_piece(start)
-        if piece.name.lower() != 'knight':
+        if not piece.leaper:
             for coord in self.coords_between(start, end):
                 if self.get_piece(coord) is not None:
                     return True
@@ -415,18 +619,11 @@ class Board:
             return False
 
     def ispawncapture(self, start, end, colour):
-        x, y, dist = BasePiece.vector(start, end)
         own_piece = self.get_piece(start)
         opp_piece = self.get_piece(end)
-        if opp_piece is not None \
-                and opp_piece.colour != self.turn \
-                and abs(x) == 1:
-            if own_piece.colour == 'white' and y == 1:
-                return True
-            elif own_piece.colour == 'black' and y == -1:
-                return True
-        else:
-            return False
+        return opp_piece is not None \
+            and opp_piece.colour != self.turn \
+            and end in movetables.targets(f'pawncapture-{own_piece.colour}', start)
     
     def isenpassantcapture(self, start, end, colour):
         s_col, s_row = start
@@ -446,20 +643,35 @@ class Board:
         else:
             return False
 
+    @staticmethod
+    def castling_rook_move(start, end, colour):
+        '''
+        Return the (start, end) coords of the rook's move when
+        the <colour> king castles from start to end.
+        Returns None if that is not a castling move.
+        '''
+        return movetables.table(f'castling-{colour}').get(start, {}).get(end)
+
     def iscastling(self, start, end, colour):
         start_piece = self.get_piece(start)
         end_piece = self.get_piece(end)
-        if not start_piece.name == 'king' or start_piece.moved:
+        if start_piece is None \
+                or not start_piece.name == 'king' or start_piece.moved:
             return False
-        x, y, dist = BasePiece.vector(start, end)
-        if not (y == 0 and abs(x) == 2):
+        rook_move = self.castling_rook_move(start, end, colour)
+        if rook_move is None:
             return False
-        rook_col = 0 if x < 0 else 7
-        rook_row = 0 if colour == 'white' else 7
-        rook_coord = (rook_col, rook_row)
+        rook_coord, rook_end = rook_move
         rook_piece = self.get_piece(rook_coord)
-        if not rook_piece.name == 'rook' or rook_piece.moved:
+        if rook_piece is None or rook_piece.colour != colour \
+                or not rook_piece.name == 'rook' or rook_piece.moved:
             return False
+        # The king and rook may only land on empty squares
+        # or on each other's starting squares
+        for coord in (end, rook_end):
+            if coord not in (start, rook_coord) \
+                    and self.get_piece(coord) is not None:
+                return False
         return True
 
     def valid_move(self, start, end, colour, **kwargs):
@@ -475,12 +687,36 @@ class Board:
             else:
                 return False
 
+    def valid_moves(self, colour):
+        '''
+        Return list of (start, end) coord pairs for every
+        valid move that <colour> can make.
+        '''
+        moves = []
+        for start in self.coords(colour):
+            piece = self.get_piece(start)
+            # Only squares that classify_move could accept need checking
+            ends = set(piece.targets(start))
+            if piece.name == 'king':
+                ends.update(movetables.table(f'castling-{colour}').get(start, ()))
+            elif piece.name == 'pawn':
+                # pawn captures and en passant captures move to
+                # an adjacent column
+                for col in (start[0] - 1, start[0] + 1):
+                    if 0 <= col <= 7:
+                        ends.update((col, row) for row in range(8))
+            for end in sorted(ends):
+                if self.valid_move(start, end, colour):
+                    moves.append((start, end))
+        return moves
+
     def classify_move(self, start, end, colour):
         '''
         Checks for the following conditions:
         1. There is a start piece of the player's colour
-        2. There is no end piece, or end piece is not of player's colour
-        3. The move is a valid castling move
+        2. The move is a valid castling move (the king may move onto
+           its own rook's square)
+        3. There is no end piece, or end piece is not of player's colour
         4. There are no pieces between start and end coord (for Rook, Bishop, Queen)
         5. The move is valid for the selected piece
         6. The move is a valid pawn capture or en passant capture
@@ -494,30 +730,112 @@ class Board:
         if start_piece is None or start_piece.colour != colour:
             raise InvalidPieceMovedError(start, end, f'{start_piece} does not belong to player')
         # (2)
-        elif end_piece is not None and end_piece.colour == colour:
-            raise DestinationIsBlockedError(start, end, f'Destination is occupied by {end_piece}')
-        # (3)
         elif self.iscastling(start, end, colour):
-            self.debugmsg(f'{start} -> {end} is castling move')
+            if self.debug:
+                self.debugmsg(f'{start} -> {end} is castling move')
             return 'castling'
+        # (3)
+        elif end_piece is not None and end_piece.colour == colour:
+            raise DestinationIsBlockedError(start, end, f'Destination is occupied by {end_piece}')
         # (4) 
         elif self.isblocked(start, end):
             raise PathIsBlockedError(start, end, f'path from {start} to {end} is blocked')
         # (5)
         elif start_piece.isvalid(start, end):
-            self.debugmsg(f'{start} -> {end} is a valid {start_piece} move')
+            if self.debug:
+                self.debugmsg(f'{start} -> {end} is a valid {start_piece} move')
             return 'move'
         # (6)
         elif start_piece.name == 'pawn':
             if self.ispawncapture(start, end, colour):
-                self.debugmsg(f'{start} -> {end} is a pawn capture')
+                if self.debug:
+                    self.debugmsg(f'{start} -> {end} is a pawn capture')
                 return 'pawncapture'
             elif self.isenpassantcapture(start, end, colour):
-                self.debugmsg(f'{start} -> {end} is en passant capture')
+                if self.debug:
+                    self.debugmsg(f'{start} -> {end} is en passant capture')
                 return 'enpassantcapture'
         else:
             raise InvalidMoveError(start, end, f'Invalid move for {start_piece}')
 
+    def attackers(self, square, colour, ignore=()):
+        '''
+        Return list of coords of <colour> pieces attacking square.
+
+        Works outward from square: pawn, knight and king squares are
+        looked up in the move tables, and each line is followed to
+        the first piece on it. Pawns attack one step diagonally forward.
+        Pieces at coords in ignore are treated as absent, so pieces
+        behind them can attack through.
+        '''
+        col, row = square
+        attackers = []
+
+        def piece_at(coord):
+            if coord in ignore:
+                return None
+            return self.position.get(coord, None)
+
+        def add_if(coord, names):
+            piece = piece_at(coord)
+            if piece is not None and piece.colour == colour \
+                    and piece.name in names:
+                attackers.append(coord)
+
+        # A <colour> pawn attacks square from where an opposing
+        # pawn on square could capture
+        other_colour = 'white' if colour == 'black' else 'black'
+        for coord in movetables.targets(f'pawncapture-{other_colour}', square):
+            add_if(coord, ('pawn',))
+        for coord in movetables.targets('knight', square):
+            add_if(coord, ('knight',))
+        for coord in movetables.targets('king', square):
+            add_if(coord, ('king',))
+        for steps, names in ((movetables.STRAIGHT_STEPS, ('rook', 'queen')),
+                             (movetables.DIAGONAL_STEPS, ('bishop', 'queen'))):
+            for x, y in steps:
+                c, r = col + x, row + y
+                while 0 <= c <= 7 and 0 <= r <= 7:
+                    piece = piece_at((c, r))
+                    if piece is not None:
+                        if piece.colour == colour and piece.name in names:
+                            attackers.append((c, r))
+                        break
+                    c, r = c + x, r + y
+        return attackers
+
+    def static_exchange(self, start, end):
+        '''
+        Return the material gained by the piece at start capturing
+        at end, if both sides then keep recapturing on end with their
+        least valuable attacker and stop when it stops paying.
+        A negative result means the capture loses material.
+        The move itself is not validated.
+        '''
+        piece = self.get_piece(start)
+        target = self.get_piece(end)
+        # gains[i]: material won by the side making capture i,
+        # if the exchange stopped there
+        gains = [target.value if target is not None else 0]
+        used = {start}
+        piece_value = piece.value
+        colour = 'white' if piece.colour == 'black' else 'black'
+        while True:
+            coords = self.attackers(end, colour, ignore=used)
+            if not coords:
+                break
+            coord = min(coords, key=lambda c: self.get_piece(c).value)
+            gains.append(piece_value - gains[-1])
+            piece_value = self.get_piece(coord).value
+            used.add(coord)
+            colour = 'white' if colour == 'black' else 'black'
+        # Each side may decline to recapture, so work back from the
+        # end of the sequence
+        while len(gains) > 1:
+            last = gains.pop()
+            gains[-1] = -max(-gains[-1], last)
+        return gains[0]
+
     def ischecked(self, colour):
         '''
         Return True if <colour> king is checked,
@@ -531,20 +849,23 @@ class Board:
                                    other_colour,
                                    debug = False,
                                    ):
-                    self.debugmsg(f'{self.get_piece(own_king_coord)} is checked by {self.get_piece(opp_coord)}')
+                    if self.debug:
+                        self.debugmsg(f'{self.get_piece(own_king_coord)} is checked by {self.get_piece(opp_coord)}')
                     return True
         return False
 
     def update(self, start, end):
         '''Update board information with the player's move.'''
-        self.remove(end)
+        # A castling king may land on its own rook, which move() handles
+        if not self.iscastling(start, end, self.turn):
+            self.remove(end)
         try:
             movetype = self.classify_move(start, end, self.turn)
         except MoveError:
             movetype = None
         self.move(start, end, movetype=movetype)
         self.check_and_promote()
-        if self.ischecked(self.turn):
+        if self.ischecked(self.turn) and self.interactive:
             print(f'{self.turn} is in check.')
 
     def next_turn(self):
@@ -555,8 +876,8 @@ class Board:
             self.turn = 'white'
 
     def winner(self):
-        white_king_alive = bool(self.get_coords('white', 'king'))
-        black_king_alive = bool(self.get_coords('black', 'king'))
+        white_king_alive = self.king_coord('white') is not None
+        black_king_alive = self.king_coord('black') is not None
         if white_king_alive and black_king_alive:
             return None
         elif white_king_alive and not black_king_alive:
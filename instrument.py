@@ -0,0 +1,160 @@
+'''
+Opt-in instrumentation for Board hot paths.
+
+Attach a Profiler to a board, either with Board(profiler=Profiler())
+or profiler.attach(board), to record call counts and cumulative time
+for the methods in Profiler.methods, and the number of MoveErrors
+raised by classify_move, by error type.
+
+With sample_every=N, the profiled methods are left unwrapped. Only
+the entry points in Profiler.windows (update and valid_moves) get a
+light wrapper, and one call in N to each of them, counted separately,
+opens a sampling window: the profiled methods are instrumented for
+the length of that call and then unwrapped again. Counts and times
+from the windows are scaled up by N, so they are estimates. This
+keeps the overhead low enough for use under real load.
+
+Only work done inside update() and valid_moves() is sampled. Calls
+made from anywhere else, such as valid_move() from prompt(), winner()
+or a direct ischecked(), are never seen in sampling mode, so they are
+missing from the scaled estimates.
+'''
+import json
+import time
+
+from errors import MoveError
+
+
+class Profiler:
+    methods = ('classify_move',
+               'isblocked',
+               'coords_between',
+               'ischecked',
+               'check_and_promote',
+               'get_coords',
+               )
+    windows = ('update', 'valid_moves')
+
+    def __init__(self, sample_every=1):
+        if type(sample_every) != int:
+            raise TypeError('sample_every must be int')
+        elif sample_every < 1:
+            raise ValueError('sample_every must be at least 1')
+        self.sample_every = sample_every
+        self.reset()
+
+    def reset(self):
+        '''Clear all recorded counts and timings.'''
+        self.calls = {name: 0 for name in self.methods}
+        self.seconds = {name: 0.0 for name in self.methods}
+        self.errors = {}
+        self.entries = {name: 0 for name in self.windows}
+        self.sampled_windows = {name: 0 for name in self.windows}
+        self.in_window = False
+
+    def attach(self, board):
+        '''
+        Instrument board by shadowing methods with wrappers on
+        the instance. Other boards and the Board class are not
+        affected.
+        '''
+        if self.sample_every == 1:
+            self.instrument(board)
+        else:
+            for name in self.windows:
+                setattr(board, name, self._window(board, name, getattr(board, name)))
+        return board
+
+    def instrument(self, board):
+        '''Wrap each profiled method of board.'''
+        for name in self.methods:
+            setattr(board, name, self._wrap(name, getattr(board, name)))
+
+    @staticmethod
+    def uninstrument(board):
+        '''Remove the profiled method wrappers from board.'''
+        for name in Profiler.methods:
+            board.__dict__.pop(name, None)
+
+    @staticmethod
+    def detach(board):
+        '''Remove all instrumentation from board.'''
+        Profiler.uninstrument(board)
+        for name in Profiler.windows:
+            board.__dict__.pop(name, None)
+        return board
+
+    def _window(self, board, name, method):
+        '''
+        Wrap an entry point so that one call in sample_every
+        runs with the profiled methods instrumented.
+        Each entry point keeps its own count, so that entry points
+        called in turn (as in a game loop) are all sampled.
+        '''
+        def wrapper(*args, **kwargs):
+            self.entries[name] += 1
+            if self.in_window or self.entries[name] % self.sample_every:
+                return method(*args, **kwargs)
+            self.in_window = True
+            self.sampled_windows[name] += 1
+            self.instrument(board)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.uninstrument(board)
+                self.in_window = False
+        wrapper.__wrapped__ = method
+        return wrapper
+
+    def _wrap(self, name, method):
+        calls = self.calls
+        seconds = self.seconds
+        errors = self.errors
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            started = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            except MoveError as e:
+                # Nested profiled methods see the same error;
+                # only count it the first time
+                if not getattr(e, 'profiled', False):
+                    e.profiled = True
+                    errorname = type(e).__name__
+                    errors[errorname] = errors.get(errorname, 0) + 1
+                raise
+            finally:
+                seconds[name] += perf_counter() - started
+        wrapper.__wrapped__ = method
+        return wrapper
+
+    def report(self):
+        '''
+        Return a dict of the recorded statistics.
+        Times are in seconds. When sampling, calls, total_seconds
+        and move_errors are estimates scaled up from the windows;
+        sampled gives the calls actually observed.
+        '''
+        scale = self.sample_every
+        methods = {}
+        for name in self.methods:
+            sampled = self.calls[name]
+            methods[name] = {'calls': sampled * scale,
+                             'sampled': sampled,
+                             'total_seconds': self.seconds[name] * scale,
+                             'mean_seconds': self.seconds[name] / sampled if sampled else 0.0,
+                             }
+        return {'sample_every': self.sample_every,
+                'windows': {'entries': dict(self.entries),
+                            'sampled': dict(self.sampled_windows),
+                            },
+                'methods': methods,
+                'move_errors': {name: count * scale
+                                for name, count in self.errors.items()},
+                }
+
+    def to_json(self, **kwargs):
+        '''Return report() as a JSON string.'''
+        return json.dumps(self.report(), **kwargs)
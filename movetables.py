@@ -0,0 +1,120 @@
+'''
+Precomputed move tables.
+
+A move table maps every square on the board to the squares a piece
+can move to from it, ignoring other pieces. Tables are registered by
+name with a builder function, built the first time they are used, and
+then cached.
+
+Pieces look up the table with their name (see BasePiece.targets), so
+a new piece needs a table registered under its name:
+
+    register('camel', jumps((1, 3), (3, 1), (3, -1), (1, -3),
+                            (-1, -3), (-3, -1), (-3, 1), (-1, 3)))
+
+A piece that jumps must also set leaper = True on its class, as Knight
+does; otherwise Board.isblocked looks for the squares in between and
+rejects any move that is not along a straight line or diagonal.
+Board.fen cannot write pieces other than the standard six.
+
+Castling tables map the king's starting square to a dict of
+{king end square: (rook start square, rook end square)}; a variant
+such as Chess960 can register its own with register('castling-white',
+...) and register('castling-black', ...).
+'''
+import functools
+
+SQUARES = tuple((col, row) for col in range(8) for row in range(8))
+
+KING_STEPS = ((1, 0), (1, 1), (0, 1), (-1, 1),
+              (-1, 0), (-1, -1), (0, -1), (1, -1))
+KNIGHT_STEPS = ((1, 2), (2, 1), (2, -1), (1, -2),
+                (-1, -2), (-2, -1), (-2, 1), (-1, 2))
+STRAIGHT_STEPS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIAGONAL_STEPS = ((1, 1), (-1, 1), (-1, -1), (1, -1))
+
+builders = {}
+
+
+def onboard(col, row):
+    return 0 <= col <= 7 and 0 <= row <= 7
+
+
+def jumps(*steps):
+    '''Return a builder for a piece that jumps by any of steps.'''
+    def builder(square):
+        col, row = square
+        return frozenset((col + x, row + y) for x, y in steps
+                         if onboard(col + x, row + y))
+    return builder
+
+
+def rays(*steps):
+    '''
+    Return a builder for a piece that slides any distance
+    in the direction of any of steps.
+    '''
+    def builder(square):
+        targets = []
+        for x, y in steps:
+            col, row = square[0] + x, square[1] + y
+            while onboard(col, row):
+                targets.append((col, row))
+                col, row = col + x, row + y
+        return frozenset(targets)
+    return builder
+
+
+def castling(row):
+    '''
+    Return a builder for standard castling on row: the king moves
+    from column 4 to column 2 or 6, and the rook from column 0 to 3
+    or from column 7 to 5.
+    '''
+    def builder(square):
+        if square != (4, row):
+            return {}
+        return {(2, row): ((0, row), (3, row)),
+                (6, row): ((7, row), (5, row)),
+                }
+    return builder
+
+
+def register(name, builder):
+    '''
+    Register builder as the table called name,
+    replacing any existing table of that name.
+    '''
+    builders[name] = builder
+    table.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def table(name):
+    '''Return the table called name, building it on first use.'''
+    builder = builders[name]
+    return {square: builder(square) for square in SQUARES}
+
+
+def targets(name, square):
+    '''
+    Return the squares reachable from square in the table called name.
+    Squares off the board have no targets.
+    '''
+    return table(name).get(square, frozenset())
+
+
+register('king', jumps(*KING_STEPS))
+register('queen', rays(*STRAIGHT_STEPS, *DIAGONAL_STEPS))
+register('bishop', rays(*DIAGONAL_STEPS))
+register('knight', jumps(*KNIGHT_STEPS))
+register('rook', rays(*STRAIGHT_STEPS))
+# Pawns may only make a two-step move as their first move
+register('pawn-white', jumps((0, 1)))
+register('pawn-white-first', jumps((0, 2)))
+register('pawncapture-white', jumps((-1, 1), (1, 1)))
+register('pawn-black', jumps((0, -1)))
+register('pawn-black-first', jumps((0, -2)))
+register('pawncapture-black', jumps((-1, -1), (1, -1)))
+register('castling-white', castling(0))
+register('castling-black', castling(7))
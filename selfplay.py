@@ -0,0 +1,199 @@
+'''
+Headless self-play for soak-testing rules and generating game records.
+
+Each game is played on a non-interactive Board through start(),
+update(), next_turn() and winner(), without prompt() or display().
+Games are spread across a process pool and each finished game is
+written out as one line of JSON as soon as it arrives.
+
+Usage:
+    python3 selfplay.py --games 1000 --white random --black greedy
+
+A player is either the name of a built-in player (see PLAYERS) or
+an importable 'module:function' spec for an engine player.
+'''
+import argparse
+import importlib
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from chess import Board
+
+
+def random_player(board, colour, moves, rng):
+    '''Pick any valid move at random.'''
+    return rng.choice(moves)
+
+
+def greedy_player(board, colour, moves, rng):
+    '''
+    Pick the move that captures the most valuable piece.
+    Ties (including moves with no capture) are broken at random.
+    '''
+    best_value = -1
+    best_moves = []
+    for start, end in moves:
+        target = board.get_piece(end)
+        value = target.value if target is not None else 0
+        if value > best_value:
+            best_value = value
+            best_moves = [(start, end)]
+        elif value == best_value:
+            best_moves.append((start, end))
+    return rng.choice(best_moves)
+
+
+PLAYERS = {'random': random_player,
+           'greedy': greedy_player,
+           }
+
+
+def get_player(spec):
+    '''
+    Return the player function for spec.
+    spec is either a key of PLAYERS or a 'module:function' string.
+    '''
+    if spec in PLAYERS:
+        return PLAYERS[spec]
+    module_name, sep, func_name = spec.partition(':')
+    if not sep:
+        raise ValueError(f'Unknown player {spec!r}; expected one of '
+                         f'{sorted(PLAYERS)} or module:function')
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def format_move(start, end):
+    '''Format a move the same way prompt() reads it, e.g. '41 43'.'''
+    return f'{start[0]}{start[1]} {end[0]}{end[1]}'
+
+
+def play_game(white, black, seed=None, max_plies=300):
+    '''
+    Play one game between the white and black player specs.
+
+    Returns a dict with the game's moves, its result (the winning
+    colour, or None), the reason it ended and its length in plies.
+    '''
+    rng = random.Random(seed)
+    players = {'white': get_player(white), 'black': get_player(black)}
+    game = Board(interactive=False)
+    game.start()
+    moves = []
+    result = None
+    termination = 'max plies'
+    try:
+        while len(moves) < max_plies:
+            result = game.winner()
+            if result is not None:
+                termination = 'king captured'
+                break
+            valid_moves = game.valid_moves(game.turn)
+            if not valid_moves:
+                termination = 'no moves'
+                break
+            start, end = players[game.turn](game, game.turn, valid_moves, rng)
+            game.update(start, end)
+            moves.append(format_move(start, end))
+            game.next_turn()
+        else:
+            result = game.winner()
+    except Exception as e:
+        result = None
+        termination = f'error: {e!r}'
+    return {'seed': seed,
+            'white': white,
+            'black': black,
+            'result': result,
+            'termination': termination,
+            'plies': len(moves),
+            'moves': moves,
+            }
+
+
+def _play_task(task):
+    '''Process pool entry point; unpacks a task tuple from run().'''
+    index, white, black, seed, max_plies = task
+    record = play_game(white, black, seed=seed, max_plies=max_plies)
+    record['game'] = index
+    return record
+
+
+def run(games, white='random', black='random', seed=0,
+        max_plies=300, workers=None, chunksize=4):
+    '''
+    Generate game records from a pool of worker processes.
+    Game i is played with seed + i, so runs are reproducible.
+    Records are yielded in completion order, not game order.
+    '''
+    tasks = ((i, white, black, seed + i, max_plies) for i in range(games))
+    if workers == 1:
+        yield from map(_play_task, tasks)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap_unordered(_play_task, tasks, chunksize)
+
+
+class Stats:
+    '''Running totals for throughput reporting.'''
+    def __init__(self):
+        self.games = 0
+        self.plies = 0
+        self.results = {}
+        self.started = time.perf_counter()
+
+    def add(self, record):
+        self.games += 1
+        self.plies += record['plies']
+        key = record['result'] or record['termination']
+        self.results[key] = self.results.get(key, 0) + 1
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        return {'games': self.games,
+                'plies': self.plies,
+                'seconds': round(elapsed, 3),
+                'games_per_second': round(self.games / elapsed, 2) if elapsed else 0.0,
+                'plies_per_second': round(self.plies / elapsed, 2) if elapsed else 0.0,
+                'results': self.results,
+                }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--white', default='random')
+    parser.add_argument('--black', default='random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-plies', type=int, default=300)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of processes (default: one per CPU)')
+    parser.add_argument('--chunksize', type=int, default=4)
+    parser.add_argument('--output', default='-',
+                        help='file for JSON-lines game records (default: stdout)')
+    parser.add_argument('--progress', type=int, default=0,
+                        help='print throughput stats every N games')
+    args = parser.parse_args(argv)
+    # Fail early on a bad player spec rather than in every worker
+    get_player(args.white)
+    get_player(args.black)
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    stats = Stats()
+    try:
+        for record in run(args.games, args.white, args.black, args.seed,
+                          args.max_plies, args.workers, args.chunksize):
+            out.write(json.dumps(record) + '\n')
+            stats.add(record)
+            if args.progress and stats.games % args.progress == 0:
+                print(json.dumps(stats.report()), file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(json.dumps(stats.report()), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
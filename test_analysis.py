@@ -0,0 +1,98 @@
+import unittest
+
+from chess import Board, King, Pawn
+from analysis import Analyser, position_key
+from selfplay import play_game
+
+START = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+class TestAnalyser(unittest.TestCase):
+    def test_analyse(self):
+        '''Positions are analysed and repeats are served from cache'''
+        game = Board()
+        game.start()
+        analyser = Analyser(maxsize=2, workers=0)
+        first, second = analyser.analyse([START, game])
+        self.assertIs(first, second)
+        self.assertEqual(first['turn'], 'white')
+        self.assertEqual(first['evaluation'], 0)
+        self.assertIsNone(first['winner'])
+        self.assertEqual(first['checked'], {'white': False, 'black': False})
+        self.assertIn(((4, 1), (4, 3)), first['moves'])
+        self.assertEqual(analyser.stats()['misses'], 1)
+        analyser.analyse([START])
+        self.assertEqual(analyser.stats()['hits'], 1)
+
+    def test_lru_eviction(self):
+        '''Least recently used position is evicted first'''
+        fens = ['4k3/8/8/8/8/8/8/4K3 w - -',
+                '4k3/8/8/8/8/8/8/3QK3 w - -',
+                '4k3/8/8/8/8/8/8/3RK3 w - -',
+                ]
+        analyser = Analyser(maxsize=2, workers=0)
+        analyser.analyse(fens[:2])
+        analyser.analyse(fens[:1])
+        analyser.analyse(fens[2:])
+        self.assertEqual(list(analyser.cache),
+                         [position_key(fens[0]), position_key(fens[2])])
+        self.assertEqual(analyser.stats()['evictions'], 1)
+
+    def test_worker_pool(self):
+        '''Results from the worker pool match in-process results'''
+        fens = [START,
+                '4k3/8/8/8/8/8/8/3QK3 w - -',
+                'r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/3P1N2/PPP2PPP/RNBQK2R b KQkq - 0 5',
+                ]
+        with Analyser(workers=2) as analyser:
+            pooled = analyser.analyse(fens)
+        self.assertEqual(pooled, Analyser(workers=0).analyse(fens))
+        self.assertEqual(pooled[1]['evaluation'], 9)
+
+    def test_matches_board(self):
+        '''Analysis of positions from real games matches the Board'''
+        analyser = Analyser(workers=0)
+        for seed in (5, 10, 21):
+            record = play_game('random', 'random', seed=seed, max_plies=120)
+            game = Board(interactive=False)
+            game.start()
+            for move in record['moves']:
+                result, = analyser.analyse([game])
+                self.assertEqual(result['moves'],
+                                 sorted(game.valid_moves(game.turn)))
+                start, end = move.split(' ')
+                game.update((int(start[0]), int(start[1])),
+                            (int(end[0]), int(end[1])))
+                game.next_turn()
+
+    def test_moved_state_in_key(self):
+        '''Boards with the same FEN but different moved counts differ'''
+        boards = []
+        for moved in (0, 1):
+            game = Board()
+            game.add((4, 0), King('white'))
+            game.add((4, 7), King('black'))
+            game.add((0, 1), Pawn('white'))
+            game.get_piece((0, 1)).moved = moved
+            game.turn = 'white'
+            boards.append(game)
+        self.assertEqual(boards[0].fen(), boards[1].fen())
+        self.assertNotEqual(position_key(boards[0]), position_key(boards[1]))
+        unmoved, moved = Analyser(workers=0).analyse(boards)
+        self.assertIn(((0, 1), (0, 3)), unmoved['moves'])
+        self.assertIn(((0, 1), (0, 2)), moved['moves'])
+
+    def test_transpositions_share_entry(self):
+        '''The same position reached by different moves is cached once'''
+        game = Board(interactive=False)
+        game.start()
+        replayed = Board(interactive=False)
+        replayed.start()
+        for start, end in [((6, 0), (5, 2)), ((6, 7), (5, 5)),
+                           ((5, 2), (6, 0)), ((5, 5), (6, 7))]:
+            replayed.update(start, end)
+            replayed.next_turn()
+        analyser = Analyser(workers=0)
+        first, second, third = analyser.analyse([game, START, replayed])
+        self.assertIs(first, second)
+        self.assertIs(first, third)
+        self.assertEqual(analyser.stats()['misses'], 1)
@@ -0,0 +1,21 @@
+import unittest
+
+from benchmark import CASES, RECORDED_GAMES, compare, parse_move, run
+
+class TestBenchmark(unittest.TestCase):
+    def test_compare(self):
+        '''Only cases slower than the threshold are regressions'''
+        baseline = {'start': 1.0, 'update': 1.0}
+        results = {'start': 1.1, 'update': 1.5, 'ischecked': 9.0}
+        self.assertEqual(compare(results, baseline, 0.2), {'update': 1.5})
+
+    def test_parse_move(self):
+        self.assertEqual(parse_move('41 43'), ((4, 1), (4, 3)))
+        for game in RECORDED_GAMES:
+            for move in game:
+                parse_move(move)
+
+    def test_run(self):
+        results = run(['start'], repeat=1)
+        self.assertEqual(list(results), ['start'])
+        self.assertIn('random_games', CASES)
@@ -222,4 +222,96 @@ class TestBonusReqs(unittest.TestCase):
         if 'movelog.txt' in os.listdir():
             with open('movelog.txt', 'r') as f:
                 line = f.readline()
-                self.assertTrue('41' in line and '42' in line)
\ No newline at end of file
+                self.assertTrue('41' in line and '42' in line)
+
+class TestBoard(unittest.TestCase):
+    def test_get_coords_follows_moves(self):
+        '''Piece lookups stay correct as pieces are added, moved and removed'''
+        game = Board()
+        game.start()
+        self.assertEqual(sorted(game.get_coords('white', 'rook')), [(0, 0), (7, 0)])
+        self.assertEqual(game.king_coord('black'), (4, 7))
+        game.move((4, 7), (4, 5))
+        self.assertEqual(game.get_coords('black', 'king'), [(4, 5)])
+        game.add((0, 0), Queen('black'))
+        self.assertEqual(game.get_coords('white', 'rook'), [(7, 0)])
+        self.assertEqual(sorted(game.get_coords('black', 'queen')), [(0, 0), (3, 7)])
+        game.remove((4, 5))
+        self.assertIsNone(game.king_coord('black'))
+        self.assertEqual(game.winner(), 'white')
+
+    def test_attackers(self):
+        '''Attackers of a square are found, including through x-rays'''
+        game = gameSetupWithKings()
+        game.add((3, 3), Pawn('black'))
+        game.add((2, 2), Pawn('white'))
+        game.add((1, 1), Bishop('white'))
+        game.add((3, 0), Rook('white'))
+        game.add((5, 4), Knight('white'))
+        game.add((3, 5), Queen('black'))
+        self.assertEqual(sorted(game.attackers((3, 3), 'white')),
+                         [(2, 2), (3, 0), (5, 4)])
+        self.assertEqual(sorted(game.attackers((3, 3), 'white', ignore={(2, 2)})),
+                         [(1, 1), (3, 0), (5, 4)])
+        self.assertEqual(game.attackers((3, 3), 'black'), [(3, 5)])
+
+    def test_static_exchange(self):
+        '''Capture sequences are scored by material won'''
+        game = gameSetupWithKings()
+        game.add((3, 3), Pawn('black'))
+        game.add((4, 4), Pawn('black'))
+        game.add((3, 0), Queen('white'))
+        # queen takes pawn, pawn takes queen
+        self.assertEqual(game.static_exchange((3, 0), (3, 3)), -8)
+        game.add((2, 2), Pawn('white'))
+        # pawn takes pawn, pawn takes pawn, queen takes pawn
+        self.assertEqual(game.static_exchange((2, 2), (3, 3)), 1)
+        self.assertEqual(game.static_exchange((2, 2), (2, 3)), 0)
+
+    def test_fen(self):
+        '''Positions convert to and from FEN'''
+        game = Board()
+        game.start()
+        self.assertEqual(game.fen(),
+            'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1')
+        game.update((4, 1), (4, 3))
+        game.next_turn()
+        fen = game.fen()
+        self.assertEqual(fen,
+            'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1')
+        copy = Board.from_fen(fen)
+        self.assertEqual(copy.fen(), fen)
+        self.assertEqual(copy.turn, 'black')
+        self.assertEqual(copy.get_piece((4, 3)).moved, 1)
+        self.assertEqual(copy.get_piece((3, 1)).moved, 0)
+        # the en passant square is only given straight after the push
+        game.update((6, 7), (5, 5))
+        game.next_turn()
+        game.update((6, 0), (5, 2))
+        game.next_turn()
+        self.assertEqual(game.fen().split()[3], '-')
+        with self.assertRaises(ValueError):
+            Board.from_fen('8/8/8 w - -')
+        # castling rights need a king and rook of that colour
+        for fen in ['4k3/8/8/8/8/8/8/R3B2R w K -',
+                    '4k3/8/8/8/8/8/8/R3K2N w K -',
+                    '4k3/8/8/8/8/8/8/r3K2r w Q -',
+                    ]:
+            with self.assertRaises(ValueError):
+                Board.from_fen(fen)
+
+    def test_render(self):
+        '''Board renders as one string and diffs only changed squares'''
+        game = Board()
+        game.start()
+        lines = game.render().split('\n')
+        self.assertEqual(len(lines), 9)
+        self.assertEqual(lines[0], '♜ ♞ ♝ ♛ ♚ ♝ ♞ ♜')
+        self.assertEqual(lines[3], ' ' * 15)
+        self.assertEqual(lines[7], '♖ ♘ ♗ ♕ ♔ ♗ ♘ ♖')
+        self.assertEqual(game.render_diff(), '')
+        game.move((4, 1), (4, 3))
+        diff = game.render_diff()
+        self.assertIn('\x1b[2A\x1b[9G \x1b[2B', diff)
+        self.assertIn('\x1b[4A\x1b[9G♙\x1b[4B', diff)
+        self.assertEqual(game.render().split('\n')[4], '        ♙      ')
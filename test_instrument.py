@@ -0,0 +1,75 @@
+import json, unittest
+
+from chess import Board, King, Rook
+from instrument import Profiler
+from selfplay import play_game
+
+def replay_game(moves, profiler):
+    '''Replay moves in a game loop that alternates valid_moves and update'''
+    game = Board(interactive=False, profiler=profiler)
+    game.start()
+    for move in moves:
+        game.valid_moves(game.turn)
+        start, end = move.split(' ')
+        game.update((int(start[0]), int(start[1])),
+                    (int(end[0]), int(end[1])))
+        game.next_turn()
+    return profiler.report()
+
+class TestProfiler(unittest.TestCase):
+    def test_counts_calls_and_errors(self):
+        '''Profiled methods and MoveErrors are counted'''
+        profiler = Profiler()
+        game = Board(profiler=profiler)
+        game.add((4, 0), King('white'))
+        game.add((4, 7), King('black'))
+        game.add((0, 0), Rook('white'))
+        game.turn = 'white'
+        self.assertFalse(game.valid_move((0, 0), (1, 1), 'white'))
+        self.assertTrue(game.valid_move((0, 0), (0, 5), 'white'))
+        report = json.loads(profiler.to_json())
+        self.assertEqual(report['methods']['classify_move']['calls'], 2)
+        # raised in coords_between, but counted once
+        self.assertEqual(report['move_errors'], {'InvalidMoveError': 1})
+
+    def test_sampling(self):
+        '''One window in N is profiled and counts are scaled up'''
+        profiler = Profiler(sample_every=4)
+        game = profiler.attach(Board(interactive=False))
+        game.start()
+        # Outside a window the profiled methods are not wrapped
+        for name in Profiler.methods:
+            self.assertNotIn(name, game.__dict__)
+        for _ in range(8):
+            game.valid_moves('white')
+        for name in Profiler.methods:
+            self.assertNotIn(name, game.__dict__)
+        report = profiler.report()
+        self.assertEqual(report['windows'],
+                         {'entries': {'update': 0, 'valid_moves': 8},
+                          'sampled': {'update': 0, 'valid_moves': 2},
+                          })
+        stats = report['methods']['classify_move']
+        self.assertGreater(stats['sampled'], 0)
+        self.assertEqual(stats['calls'], stats['sampled'] * 4)
+
+    def test_sampled_estimates(self):
+        '''Sampled estimates are close to the full profile in a game loop'''
+        moves = play_game('random', 'random', seed=0, max_plies=200)['moves']
+        full = replay_game(moves, Profiler())
+        sampled = replay_game(moves, Profiler(sample_every=10))
+        self.assertGreater(sampled['windows']['sampled']['update'], 0)
+        self.assertGreater(sampled['windows']['sampled']['valid_moves'], 0)
+        for name in Profiler.methods:
+            self.assertAlmostEqual(sampled['methods'][name]['calls'],
+                                   full['methods'][name]['calls'],
+                                   delta=0.25 * full['methods'][name]['calls'])
+        self.assertEqual(set(sampled['move_errors']), set(full['move_errors']))
+
+    def test_detach(self):
+        profiler = Profiler()
+        game = profiler.attach(Board())
+        Profiler.detach(game)
+        game.start()
+        game.get_coords('white', 'king')
+        self.assertEqual(profiler.report()['methods']['get_coords']['calls'], 0)
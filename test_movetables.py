@@ -0,0 +1,78 @@
+import unittest
+
+import movetables
+from chess import Board, BasePiece, King, Knight, Rook
+
+class Camel(BasePiece):
+    name = 'camel'
+    leaper = True
+    sym = {'white': 'C', 'black': 'c'}
+
+class TestMoveTables(unittest.TestCase):
+    def test_tables(self):
+        '''Tables hold the squares each piece can reach'''
+        self.assertEqual(movetables.targets('knight', (0, 0)), {(1, 2), (2, 1)})
+        self.assertEqual(len(movetables.targets('queen', (3, 3))), 27)
+        self.assertEqual(movetables.targets('pawn-white-first', (4, 1)), {(4, 3)})
+        self.assertEqual(movetables.targets('pawncapture-black', (0, 6)), {(1, 5)})
+        self.assertEqual(movetables.targets('king', (8, 8)), frozenset())
+        self.assertIs(movetables.table('rook'), movetables.table('rook'))
+
+    def test_register_fairy_piece(self):
+        '''A new piece moves by the table registered under its name'''
+        movetables.register('camel', movetables.jumps((1, 3), (3, 1)))
+        self.addCleanup(movetables.builders.pop, 'camel')
+        game = Board()
+        game.add((4, 0), King('white'))
+        game.add((4, 7), King('black'))
+        game.add((0, 0), Camel('white'))
+        game.turn = 'white'
+        self.assertTrue(game.valid_move((0, 0), (1, 3), 'white'))
+        self.assertFalse(game.valid_move((0, 0), (1, 2), 'white'))
+        with self.assertRaises(ValueError):
+            game.fen()
+
+    def test_register_castling(self):
+        '''Castling follows the registered castling table'''
+        default = movetables.builders['castling-white']
+        self.addCleanup(movetables.register, 'castling-white', default)
+        # king on column 1 castles to column 6 with the rook on column 7
+        movetables.register('castling-white', lambda square:
+            {(6, 0): ((7, 0), (5, 0))} if square == (1, 0) else {})
+        game = Board()
+        game.add((1, 0), King('white'))
+        game.add((7, 0), Rook('white'))
+        game.add((4, 7), King('black'))
+        game.turn = 'white'
+        game.update((1, 0), (6, 0))
+        self.assertEqual(game.get_piece((6, 0)).name, 'king')
+        self.assertEqual(game.get_piece((5, 0)).name, 'rook')
+
+    def test_castle_onto_rook(self):
+        '''King can castle onto its own rook's square'''
+        default = movetables.builders['castling-white']
+        self.addCleanup(movetables.register, 'castling-white', default)
+        # king on column 1 castles to column 6, where the rook stands
+        movetables.register('castling-white', lambda square:
+            {(6, 0): ((6, 0), (5, 0))} if square == (1, 0) else {})
+        game = Board()
+        game.add((1, 0), King('white'))
+        game.add((6, 0), Rook('white'))
+        game.add((4, 7), King('black'))
+        game.turn = 'white'
+        self.assertEqual(game.classify_move((1, 0), (6, 0), 'white'), 'castling')
+        game.update((1, 0), (6, 0))
+        self.assertEqual(game.get_piece((6, 0)).name, 'king')
+        self.assertEqual(game.get_piece((5, 0)).name, 'rook')
+        self.assertIsNone(game.get_piece((1, 0)))
+        self.assertEqual(game.get_coords('white', 'rook'), [(5, 0)])
+
+    def test_castling_destination_occupied(self):
+        '''Castling is not allowed onto a square held by another piece'''
+        game = Board()
+        game.add((4, 0), King('white'))
+        game.add((0, 0), Rook('white'))
+        game.add((3, 0), Knight('white'))
+        game.add((4, 7), King('black'))
+        game.turn = 'white'
+        self.assertFalse(game.iscastling((4, 0), (2, 0), 'white'))
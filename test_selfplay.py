@@ -0,0 +1,34 @@
+import random, unittest
+
+from chess import Board, King, Rook
+from selfplay import play_game, run, greedy_player, get_player
+
+class TestSelfPlay(unittest.TestCase):
+    def test_game_is_reproducible(self):
+        '''Same seed gives the same game'''
+        first = play_game('random', 'greedy', seed=3, max_plies=40)
+        second = play_game('random', 'greedy', seed=3, max_plies=40)
+        self.assertEqual(first, second)
+        self.assertEqual(first['plies'], len(first['moves']))
+        self.assertLessEqual(first['plies'], 40)
+
+    def test_greedy_captures(self):
+        '''Greedy player takes the most valuable piece'''
+        game = Board(interactive=False)
+        game.add((4, 0), King('white'))
+        game.add((4, 7), King('black'))
+        game.add((4, 5), Rook('white'))
+        game.turn = 'white'
+        moves = game.valid_moves('white')
+        self.assertIn(((4, 5), (4, 7)), moves)
+        self.assertEqual(greedy_player(game, 'white', moves, random.Random(0)),
+                         ((4, 5), (4, 7)))
+
+    def test_run_streams_every_game(self):
+        '''run() yields one record per game'''
+        records = list(run(4, seed=10, max_plies=20, workers=1))
+        self.assertEqual(sorted(r['game'] for r in records), [0, 1, 2, 3])
+
+    def test_unknown_player(self):
+        with self.assertRaises(ValueError):
+            get_player('nosuchplayer')